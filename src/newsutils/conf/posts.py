@@ -97,6 +97,7 @@ class Posts(AppSettings):
     # BasePipeline's `get_setting` raises an exception if settings are not defined.
     CRAWL_DB_URI = 'mongodb://localhost:27017/scraped_news_db'
     CRAWL_DB_SPIDERS = '_spiders'
+    CRAWL_DB_NLP_CACHE = '_nlp_cache'   # summarization results, by text hash
 
     # DB_ID_FIELD: row id from the database engine
     DB_ID_FIELD = '_id'
@@ -1,6 +1,13 @@
+import atexit
 import configparser
 import logging
+import queue
+import sys
+import threading
+import time
+import traceback
 import typing
+from logging.handlers import QueueHandler, QueueListener
 
 from rich import color, errors, print as printf
 from rich.console import Console
@@ -8,6 +15,8 @@ from rich.logging import RichHandler
 
 from rich.theme import Theme
 
+from newsutils.helpers import get_env
+
 HIGHLIGHTED_KEYWORDS = [  # these keywords are highlighted specially
     "Played",
     "animations",
@@ -28,12 +37,73 @@ WRONG_COLOR_CONFIG_MSG = """
 Loading the default color configuration.[/logging.level.error]
 """
 
+# console output buffering
+# bytes size of the buffer, and max. time (secs) buffered output may wait for.
+CONSOLE_BUFFER_SIZE = 64 * 1024
+CONSOLE_FLUSH_INTERVAL = .05
+
+# max. console calls pending for the background writer.
+# callers block when the queue is full, ie. no output ever gets dropped.
+CONSOLE_QUEUE_SIZE = get_env('CONSOLE_QUEUE_SIZE', 8000, coerce=True)
+
+# max. time (secs) to wait for deferred console calls at exit.
+CONSOLE_FLUSH_TIMEOUT = 5
+
+
+class BufferedOutput:
+    """
+    File-like object that collects console writes in memory, and only
+    hits the underlying stream (defaults to `sys.stdout`) when `.drain()` is called,
+    or the buffer is full.
+
+    Rich flushes its file after every `console.print()`, hence `.flush()` is a no-op,
+    the actual flushing is left to the background console writer.
+    """
+
+    def __init__(self, stream=None, size=CONSOLE_BUFFER_SIZE):
+        self._stream = stream
+        self.size = size
+        self._chunks = []
+        self._len = 0
+        self._lock = threading.Lock()
+
+    @property
+    def stream(self):
+        # resolved lazily, since `sys.stdout` may get swapped (eg. by pytest)
+        return self._stream or sys.stdout
+
+    def write(self, text):
+        with self._lock:
+            self._chunks.append(text)
+            self._len += len(text)
+            full = self._len >= self.size
+        if full:
+            self.drain()
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """ Write buffered output to the underlying stream at once. """
+        with self._lock:
+            chunks, self._chunks, self._len = self._chunks, [], 0
+            if chunks:
+                self.stream.write("".join(chunks))
+                self.stream.flush()
+
+    def __getattr__(self, name):
+        # eg. `.isatty()`, `.fileno()`, `.encoding` used by rich
+        return getattr(self.stream, name)
+
+
 # throughout the codebase, use:
 # >>> console.print() # instead of print()
 # >>> with console.status()
 # >>>    ...
 console = Console(
     width=160,
+    file=BufferedOutput(),
     theme=Theme({
         "logging.keyword": 'bold yellow',
         # "logging.level.notset": 'dim',
@@ -54,6 +124,98 @@ console = Console(
 )
 
 
+# console calls `(fn, args, kwargs)` pending for the background writer
+_console_queue = queue.Queue(maxsize=CONSOLE_QUEUE_SIZE)
+
+
+def defer_console(fn, *args, **kwargs):
+    """
+    Run console call `fn(*args, **kwargs)` on the background writer thread,
+    keeping rich rendering and terminal writes off the caller's thread.
+    Calls are run in order. Run right away if the writer isn't running,
+    eg. in a process forked after import, or after the writer died.
+
+    Usage:
+    >>> defer_console(console.print, "message")
+    """
+    while _writer.is_alive():
+        try:
+            _console_queue.put((fn, args, kwargs), timeout=CONSOLE_FLUSH_INTERVAL)
+            return
+        except queue.Full:
+            continue
+    _run(fn, *args, **kwargs)
+    _drain()
+
+
+def flush_console(timeout=CONSOLE_FLUSH_TIMEOUT):
+    """ Wait (up to `timeout` secs) for deferred console calls,
+    and push buffered output out to the terminal. """
+    deadline = time.monotonic() + timeout
+    with _console_queue.all_tasks_done:
+        while _console_queue.unfinished_tasks and _writer.is_alive():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            _console_queue.all_tasks_done.wait(remaining)
+    _drain()
+
+
+def _run(fn, *args, **kwargs):
+    try:
+        fn(*args, **kwargs)
+    except Exception:
+        traceback.print_exc()
+
+
+def _drain():
+    """ Push buffered output out. Write errors (eg. broken pipe, closed stdout) are ignored. """
+    try:
+        console.file.drain()
+    except Exception:
+        pass
+
+
+def _console_writer():
+    """ Runs deferred console calls in order. Drains buffered output whenever idle. """
+    while True:
+        try:
+            fn, args, kwargs = _console_queue.get(timeout=CONSOLE_FLUSH_INTERVAL)
+        except queue.Empty:
+            _drain()
+            continue
+        _run(fn, *args, **kwargs)
+        _console_queue.task_done()
+        if _console_queue.empty():
+            _drain()
+
+
+_writer = threading.Thread(target=_console_writer, name="console-writer", daemon=True)
+_writer.start()
+atexit.register(flush_console)
+
+
+# log records pending for the rich handler, which renders them on the thread
+# of `_log_listener`. records are prepared (formatted) by the logging thread.
+_log_queue = queue.Queue()
+_log_listener = None
+_log_listener_lock = threading.Lock()
+
+
+def _start_log_listener():
+    """ Start rendering queued log records with the rich handler, once per process. """
+    global _log_listener
+    with _log_listener_lock:
+        if _log_listener:
+            return
+        RichHandler.KEYWORDS = HIGHLIGHTED_KEYWORDS
+        rich_handler = RichHandler(
+            console=console, show_time=True, show_path=False, markup=True)
+        _log_listener = QueueListener(_log_queue, rich_handler, respect_handler_level=True)
+        _log_listener.start()
+        atexit.register(_log_listener.stop)
+
+
 def parse_theme(parser: configparser.ConfigParser) -> Theme:
     """
     Configure the rich style of logger and console output.
@@ -95,7 +257,7 @@ def parse_theme(parser: configparser.ConfigParser) -> Theme:
     return custom_theme
 
 
-def make_logger(name: str, verbosity: str = 'UNSET') \
+def make_logger(name: str, verbosity: str = 'NOTSET') \
         -> typing.Tuple[logging.Logger, Console]:
     """
     Make the manim logger and console.
@@ -107,16 +269,15 @@ def make_logger(name: str, verbosity: str = 'UNSET') \
 
     """
 
-    # set the rich handler
-    RichHandler.KEYWORDS = HIGHLIGHTED_KEYWORDS
-    rich_handler = RichHandler(
-        rich_tracebacks=True, tracebacks_show_locals=True,
-        console=console, show_time=True
-    )
-
     # finally, the logger
+    # configured once per name, ie. for all objects logging under that name.
     logger = logging.getLogger(name)
-    logger.addHandler(rich_handler)
+    if not any(isinstance(h, QueueHandler) for h in logger.handlers):
+
+        # records get rendered by the rich handler, from the log listener thread
+        logger.addHandler(QueueHandler(_log_queue))
+        _start_log_listener()
+
     logger.setLevel(verbosity)
 
     return logger, console
@@ -1,3 +1,4 @@
+import threading
 from typing import Iterable
 
 from bson import ObjectId
@@ -38,6 +39,13 @@ class Day(PostStrategyMixin, Collection):
         self.task_type = task_type
         self.posts = list(self.get_posts(**match))
 
+        # positions of posts inside `self.posts`, by (str) db id
+        self.post_index = {str(p[self.db_id_field]): i for i, p in enumerate(self.posts)}
+
+        # posts may get saved concurrently, eg. by `DayNlp.save_day()`:
+        # guards in-memory updates of `.posts` and `.post_index`
+        self.lock = threading.RLock()
+
     @property
     def date(self):  # str(self) -> the collection's name
         return mk_date(str(self))
@@ -46,8 +54,9 @@ class Day(PostStrategyMixin, Collection):
         """ Get posts based on strategy.
         Posts are loaded from db `as-is`, ie. not expanding related fields!
         """
+        filter_metapost = self.get_decision("filter_metapost")
         pipe = compose(
-            lambda p: self.get_decision("filter_metapost")(p, self.task_type),
+            lambda p: filter_metapost(p, self.task_type),
             lambda p: Post(p)
         )
         posts = map(pipe, self.find(match=match))
@@ -70,9 +79,11 @@ class Day(PostStrategyMixin, Collection):
         """
 
         if isinstance(lookup, (str, ObjectId)):
-            return next(filter(lambda p: str(p[self.db_id_field]) == str(lookup), self.posts), None)
+            i = self.post_index.get(str(lookup))
+            return self.posts[i] if i is not None else None
         if isinstance(lookup, Post):
-            return lookup if lookup in self.posts else None
+            i = self.post_index.get(str(lookup.get(self.db_id_field)))
+            return lookup if i is not None and self.posts[i] == lookup else None
         if isinstance(lookup, int):
             post = None
             try:
@@ -93,11 +104,14 @@ class Day(PostStrategyMixin, Collection):
         """
         existed = self[loc]
         if existed:
-            self.posts[self.posts.index(existed)] = post
+            i = self.post_index[str(existed[self.db_id_field])]
+            self.posts[i] = post
+            self.post_index[str(post[self.db_id_field])] = i
         else:
             self += post
 
     def __add__(self, other):
+        self.post_index[str(other[self.db_id_field])] = len(self.posts)
         self.posts += [other]
 
     def save(self, post: Post, id_field_or_match=None, only=None):
@@ -144,7 +158,8 @@ class Day(PostStrategyMixin, Collection):
                 db_post = Post(db_post)
                 db_post_id = ObjectId(adapter.item[self.db_id_field])
                 if self.get_decision("filter_metapost")(db_post, self.task_type):
-                    self[db_post_id] = db_post
+                    with self.lock:
+                        self[db_post_id] = db_post
 
             # log
             op = 'inserted' if r.upserted_id else 'updated'
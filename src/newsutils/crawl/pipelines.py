@@ -16,6 +16,10 @@ __all__ = [
 ]
 
 
+# max. count of `Day` instances (hence, of days of posts) kept in memory by pipelines
+PIPELINE_MAX_DAYS = 8
+
+
 class PipelineMixin(PostConfigMixin):
     """
     Foundational block for building pipelines
@@ -102,6 +106,10 @@ class BasePostPipeline(PipelineMixin, abc.ABC):
     errors = []
     post_time = None
 
+    # `Day` instances, by date, least recently loaded first. shared by all pipelines:
+    # only the `PIPELINE_MAX_DAYS` most recently loaded days are kept, cf. `.get_day()`
+    _days = {}
+
     def process_item(self, item, spider):
         """
         Use `process_post()` instead for processing `Post` items. This enables :
@@ -121,8 +129,6 @@ class BasePostPipeline(PipelineMixin, abc.ABC):
         else:
             self.post = item
             self.post_time = mk_datetime(item.get('publish_time'))
-            # FIXME: don't init a Day() and read entire collection that
-            #   possible changed every time a pipeline is loaded !
             self.day = self.get_day()
             return self.process_post()
 
@@ -151,10 +157,15 @@ class BasePostPipeline(PipelineMixin, abc.ABC):
         return not bool(self.errors)
 
     def get_day(self):
-        """ Daily collection the current post will be saved under. """
-        # FIXME: cache Day instance?
-        #   return self.day or Day(str(self.post_time.date())) ?
-        return Day(str(self.post_time.date()))
+        """ Daily collection the current post will be saved under.
+        Cached by date, since a `Day` loads all its posts from the db.
+        Hence, its `.posts` do NOT reflect posts saved afterwards. """
+        date = str(self.post_time.date())
+        if date not in self._days:
+            if len(self._days) >= PIPELINE_MAX_DAYS:
+                self._days.pop(next(iter(self._days)))
+            self._days[date] = Day(date)
+        return self._days[date]
 
     @abc.abstractmethod
     def process_post(self):
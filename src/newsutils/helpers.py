@@ -59,10 +59,9 @@ dictunion = dictlist_factory('union')
 # solves error: `{TypeError}unhashable type: 'dict'` yielded by
 # the **set(dict)** construct, cf. https://stackoverflow.com/a/38521207
 # by freezing every dict (all items in dict at once) !
-uniquedicts = lambda *dict_lists: reduce(lambda l1, l2: [
-    dict(s) for s in {*[frozenset(d.items()) for d in l1],
-                      *[frozenset(d.items()) for d in l2]}
-], dict_lists)
+uniquedicts = lambda *dict_lists: [
+    dict(s) for s in {frozenset(d.items()) for l in dict_lists for d in l}
+]
 
 
 # compose any number of functions in given order
@@ -80,12 +79,14 @@ flatmap = lambda f, xs: (y for ys in xs for y in f(ys))
 wordcount = lambda sent: len(sent.split(" "))
 
 
+_FULLSTOPS = tuple(".!?…")
+
+
 def add_fullstop(sent: str):
     """ add fullstop to sentence. """
     if not sent:
         return ""
-    return sent if any([sent.endswith(_) for _ in ".!?…"]) \
-        else sent + "."
+    return sent if sent.endswith(_FULLSTOPS) else sent + "."
 
 
 def camel_to_snake(name):
@@ -2,12 +2,12 @@
 # vim: ai ts=4 sts=4 et sw=4
 import logging
 import string
-from functools import reduce
+from contextlib import nullcontext
+from functools import cached_property
 from typing import List, Callable
 
 from rich.console import OverflowMethod
-from rich.logging import RichHandler
-from newsutils.console import make_logger
+from newsutils.console import make_logger, defer_console
 
 from newsutils.console import console
 
@@ -31,6 +31,12 @@ PADDING_INTERNAL = 20
 PADDING = 10
 SEP_LINE = '-' * 70
 
+# format spec padding message statuses, eg. `f"{OK:{_STATUS_SPEC}}"`
+_STATUS_SPEC = f"<{PADDING}"
+
+# translation table that deletes '{' and '}' from a string
+_STRIP_BRACES = str.maketrans('', '', '{}')
+
 
 def log_running(
     title=None,
@@ -42,12 +48,16 @@ def log_running(
 
     def _log_running(task):
         def wrapper(self, *args, **kwargs):
-            with self.console.status(title, spinner="monkey"):
-                self.console.rule(f"[bold blue]{title}")
+            # the spinner (and its refresh thread) is pointless
+            # if nobody is watching, eg. output piped to a file.
+            status = self.console.status(title, spinner="monkey") \
+                if self.console.is_terminal else nullcontext()
+            with status:
+                defer_console(self.console.rule, f"[bold blue]{title}")
                 if description:
                     self.log_task(logging.INFO, TASK_RUNNING, description, overflow=overflow, style=style)
                 r = task(self, *args, **kwargs)
-                self.console.print()
+                defer_console(self.console.print)
                 return r
         # yields a stub that picks the decorated
         # method's params, and call it
@@ -67,10 +77,7 @@ class LoggingMixin:
     log_prefix = None
     console = console
 
-    _logger_name = None
-    _logger = None
-
-    @property
+    @cached_property
     def logger_name(self):
         """
         Returns the name of the log which will receive messages emitted
@@ -80,40 +87,50 @@ class LoggingMixin:
 
         eg. This would pick the Spider name (`.name`)
         """
-        if not self._logger_name:
-            name = getattr(self, 'name', None) or type(self).__name__.lower()
-            self._logger_name = f"{name:<{PADDING_INTERNAL}}"
-        return self._logger_name
+        name = getattr(self, 'name', None) or type(self).__name__.lower()
+        return f"{name:<{PADDING_INTERNAL}}"
 
-    @property
+    @cached_property
+    def log_header(self):
+        """
+        Padded prefix of every message logged by this object,
+        eg. `spider_name          >> `. Computed once per instance.
+        """
+        return f"{self.log_prefix or self.logger_name:<{PADDING_INTERNAL}}>> "
+
+    @cached_property
     def logger(self):
-        if not self._logger:
-            # check the type of the output of _log_name, since logging.getLogger
-            # doesn't bother, resulting in an obscure explosion for non-strings
-            if not isinstance(self.logger_name, str):
-                raise TypeError(
-                    "%s.logger_name returned '%r' (%s). (wanted a string)" % (
-                        type(self).__name__, self.logger_name, type(self.logger_name).__name__)
-                )
-            # configure the logger
-            # scrapy discards the root handler and installs its own
-            # https://gitlab1.cs.cityu.edu.hk/gsalter2/dockers/-/blob/37836f254c8fcc10f70b991eb0c6f5c31378bcb4/manim/manim/_config/logger_utils.py
-            # FIXME: change scrapy's default handler to RichHandler
-            self._logger = logging.getLogger(self.logger_name)
-            self._logger.handlers = [RichHandler()]
-            self._logger.propagate = not self.root_logger_disabled
-
-            self._logger, _ = make_logger(self.logger_name)
-        return self._logger
+        # check the type of the output of _log_name, since logging.getLogger
+        # doesn't bother, resulting in an obscure explosion for non-strings
+        if not isinstance(self.logger_name, str):
+            raise TypeError(
+                "%s.logger_name returned '%r' (%s). (wanted a string)" % (
+                    type(self).__name__, self.logger_name, type(self.logger_name).__name__)
+            )
+        # configure the logger
+        # scrapy discards the root handler and installs its own
+        # https://gitlab1.cs.cityu.edu.hk/gsalter2/dockers/-/blob/37836f254c8fcc10f70b991eb0c6f5c31378bcb4/manim/manim/_config/logger_utils.py
+        # FIXME: change scrapy's default handler to RichHandler
+        logger, _ = make_logger(self.logger_name)
+        logger.propagate = not self.root_logger_disabled
+        return logger
 
     def wrap_logger(self, level, msg, exc_info=False, *args, **kwargs):
-        full_msg = NamespaceFormatter().format(
-            # '%s >> ' % (self.log_prefix or self.logger_name) + msg,
-            f"%-{PADDING_INTERNAL}s%s " % (self.log_prefix or self.logger_name, ">>") + msg,
-            *args, **kwargs)
+        # cheap check first: don't format nor print messages
+        # whose level is disabled for this object's logger.
+        if not self.logger.isEnabledFor(level):
+            return None
+
+        # no substitutions: most messages are already formatted by the caller (f-strings)
+        if '{' not in msg and not args and not kwargs:
+            full_msg = self.log_header + msg
+        elif not args:
+            full_msg = (self.log_header + msg).format_map(_Namespace(kwargs))
+        else:
+            full_msg = _formatter.vformat(self.log_header + msg, args, kwargs)
 
-        # debug
-        self.console.print(full_msg)
+        # rendered once, by the logger's rich handler
+        self.logger.log(level, full_msg, exc_info=exc_info)
 
         return full_msg
 
@@ -178,9 +195,9 @@ class NamespaceFormatter(string.Formatter):
     Provides defaults in case kw are not supplied by caller
     """
 
-    def __init__(self, namespace={}):
+    def __init__(self, namespace=None):
         string.Formatter.__init__(self)
-        self.namespace = namespace
+        self.namespace = namespace or {}
 
     def get_value(self, key, args, kwargs):
         if isinstance(key, str):
@@ -190,7 +207,21 @@ class NamespaceFormatter(string.Formatter):
             except KeyError:
                 return self.namespace.get(key, '{{{0}}}'.format(key))
         else:
-            string.Formatter.get_value(key, args, kwargs)
+            return string.Formatter.get_value(self, key, args, kwargs)
+
+
+# shared formatter used by `LoggingMixin.wrap_logger()`,
+# saves instantiating a new formatter on every log call.
+_formatter = NamespaceFormatter()
+
+
+class _Namespace(dict):
+    """
+    Same as `NamespaceFormatter`, but for keyword-only substitutions with
+    `str.format_map()`, whose parsing runs in C instead of `string.Formatter`.
+    """
+    def __missing__(self, key):
+        return '{%s}' % key
 
 
 class TaskLoggerMixin(LoggingMixin):
@@ -200,9 +231,12 @@ class TaskLoggerMixin(LoggingMixin):
     """
 
     def log_task(self, level, status, log_msg: str or Callable, *args, **kwargs):
+        # don't build (possibly expensive) messages that won't get logged
+        if not self.logger.isEnabledFor(level):
+            return None
         if callable(log_msg):
-            return self.wrap_logger(level, f"{status:{PADDING}}{log_msg(*args, **kwargs)}")
-        return self.wrap_logger(level, f"{status:{PADDING}}{log_msg}", *args, **kwargs)
+            return self.wrap_logger(level, f"{status:{_STATUS_SPEC}}{log_msg(*args, **kwargs)}")
+        return self.wrap_logger(level, f"{status:{_STATUS_SPEC}}{log_msg}", *args, **kwargs)
 
     def log_started(self, log_msg, *args, **kwargs):
         return self.log_task(logging.INFO, STARTED, log_msg, *args, **kwargs)
@@ -215,7 +249,7 @@ class TaskLoggerMixin(LoggingMixin):
         if exc:
             # exclude '{' and '}' from the exception msg,
             # it causes and exception being raised by backing Formatter class.
-            errmsg = reduce(lambda s, v: s.replace(v, ''), '{}', str(exc))
+            errmsg = str(exc).translate(_STRIP_BRACES)
             self.log_task(logging.DEBUG, FAILED, errmsg)
         # TODO: not sure if/wt to return here
 
@@ -223,8 +257,8 @@ class TaskLoggerMixin(LoggingMixin):
         return self.log_task(logging.INFO, DONE, log_msg, *args, **kwargs)
 
     def log_task_ended(self, log_msg, *args, **kwargs):
-        self.console.rule(f"[bold blue] {TASK_ENDED}")
+        defer_console(self.console.rule, f"[bold blue] {TASK_ENDED}")
         msg = self.log_task(logging.INFO, DONE, log_msg, *args, **kwargs)
-        self.console.rule()
+        defer_console(self.console.rule)
         return msg
 
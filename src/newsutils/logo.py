@@ -1,5 +1,18 @@
-import os
-from urllib.parse import urlparse
+# possible logo extensions
+LOGO_EXTENSIONS = frozenset({".png", ".gif", ".jpg", ".tif", ".tiff", ".bmp", ".svg"})
+
+# XPath 1.0 has no `lower-case()`
+_lower = lambda expr: \
+    f"translate({expr}, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')"
+
+# @src of <img> inside <a> linking to the home page (`$homepage`) or index,
+# with a logo file extension or a 'logo' substring in its @class, @title or @alt.
+# the entire filter runs in libxml2.
+HOMEPAGE_LOGO_XPATH = "//a[@href = $homepage or starts-with(@href, 'index.')]//img[%s]/@src" % " or ".join([
+    *[f"substring({_lower('@src')}, string-length(@src) - {len(ext) - 1}) = '{ext}'"
+      for ext in sorted(LOGO_EXTENSIONS)],
+    *[f"contains({_lower(attr)}, 'logo')" for attr in ('@class', '@title', '@alt')]
+])
 
 
 def parse_logo(response):
@@ -7,76 +20,37 @@ def parse_logo(response):
     Parse logo url from response.
     """
 
-    def clean_url(url):
-        return urlparse(url).geturl()
-
-    # List possible logo extensions
-    ext_list = [".png", ".gif", ".jpg", ".tif", ".tiff", ".bmp", ".svg"]
-
     # Extract the Home Page Address or Website First Page Address
+    # ie. last non-empty segment of the url
     str_url = str(response.url).lower()
-    parts = len(str_url.split("/"))
-    if len(str_url.split("/")[parts - 1]) == 0:
-        homepage = str_url.split("/")[parts - 2]
-    else:
-        homepage = str_url.split("/")[parts - 1]
-    print(homepage)
+    homepage = str_url.rstrip("/").rsplit("/", 1)[-1]
 
-    img_url_list = []
-    url_list = []
-    case_list = []
-    found = False
+    # only the first case that yields images is retained,
+    # ie. all found images share the same page url and case.
 
     # Case 1: when <a> contains <img> with logo substring in its @src
-    for tag_a in response.xpath('//a'):
-        for tag_img in tag_a.xpath('.//img'):
-            img_url = str(tag_img.xpath('@src').get())
-            img_url = clean_url(img_url)
-            ind = img_url.find('logo')
-            if ind > 0:
-                found = True
-                img_url_list.append(img_url)
-                url_list.append(str_url)
-                case_list.append('1')
+    img_url_list = response.xpath('//a//img[contains(@src, $n)]/@src', n='logo').getall()
+    case = '1'
 
     # Case 2: when <div> contains <img>  with logo substring in its @src
-    if not found:
-        for tag_div in response.xpath('//div'):
-            for tag_img in tag_div.xpath('.//img'):
-                img_url = str(tag_img.xpath('@src').get())
-                img_url = clean_url(img_url)
-                ind = img_url.find('logo')
-                if ind > 0:
-                    found = True
-                    img_url_list.append(img_url)
-                    url_list.append(str_url)
-                    case_list.append('2')
+    if not img_url_list:
+        img_url_list = response.xpath('//div//img[contains(@src, $n)]/@src', n='logo').getall()
+        case = '2'
 
     # Case 3: when <a> contains @href as home page address or index. and
     # <img> with possible file extension as like (.png, .gif, .jpg etc) and
     # logo substring in its @class or @title or @alt
-    if not found:
-        for tag_a in response.xpath('//a'):
-            a_href = str(tag_a.xpath('@href').get())
-            a_href = clean_url(a_href)
-            if a_href[:6] == str("index.") or a_href == homepage:
-                for tag_img in tag_a.xpath('.//img'):
-                    img_url = str(tag_img.xpath('@src').get())
-                    img_url = clean_url(img_url)
-                    img_name, img_ext = os.path.splitext(img_url)
-
-                    tag_class = str(tag_img.xpath('@class').get()).lower().strip()
-                    title = str(tag_img.xpath('@title').get()).lower().strip()
-                    alt = str(tag_img.xpath('@alt').get()).lower().strip()
-
-                    if img_ext in ext_list or tag_class.find("logo") > 0 or title.find("logo") > 0 or \
-                            alt.find("logo") > 0:
-                        found = True
-                        img_url_list.append(img_url)
-                        url_list.append(str_url)
-                        case_list.append('3')
+    if not img_url_list:
+        img_url_list = response.xpath(HOMEPAGE_LOGO_XPATH, homepage=homepage).getall()
+        case = '3'
 
-    data = {'img_url_list': img_url_list, 'url_list': url_list, 'case_list': case_list}
+    # resolve image urls relative to the page, or its <base href>
+    img_url_list = [response.urljoin(img_url) for img_url in img_url_list]
+    data = {
+        'img_url_list': img_url_list,
+        'url_list': [str_url] * len(img_url_list),
+        'case_list': [case] * len(img_url_list)
+    }
 
     # for div in response.css('div'):
     #     for img in div.xpath('img'):
@@ -1,16 +1,28 @@
 import datetime
 import hashlib
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, cached_property
+from itertools import takewhile, islice
 from typing import Iterable
 from urllib.parse import urlparse
 
+import nltk
+import numpy as np
+import pycountry
 from daily_query.helpers import mk_datetime
-from newsnlp import TextSummarizer, TitleSummarizer, Categorizer, TfidfVectorizer
+from daily_query.mongo import Collection
+from newsnlp import TextSummarizer, TitleSummarizer, Categorizer
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
 
 from newsutils.conf import LINK, TaskTypes, SHORT_LINK, LINK_HASH
 from newsutils.conf.mixins import PostConfigMixin
 from newsutils.crawl import Day
-from newsutils.helpers import wordcount, uniquedicts, dictdiff, add_fullstop, import_attr
+from newsutils.helpers import wordcount, uniquedicts, add_fullstop, import_attr
 from newsutils.crawl.items import BOT, THIS_PAPER
 from newsutils.conf.post_item import Post, mk_post
 from newsutils.conf import \
@@ -21,6 +33,20 @@ from newsutils.conf import \
 
 CATEGORY_NOT_FOUND = 'N/A'
 
+# version of summaries cached in the db (`CRAWL_DB_NLP_CACHE`).
+# bump to invalidate existing cached summaries, eg. after upgrading the models.
+SUMMARY_CACHE_VERSION = 1
+
+# time (secs) after which cached summaries expire from the db, counted from caching.
+SUMMARY_CACHE_TTL = 30 * 24 * 3600
+
+# max. size (posts x terms) of TF-IDF matrices whose similarities
+# are computed as a dense matmul (BLAS), rather than a sparse one.
+DENSE_SIMILARITY_MAX_SIZE = 5_000_000
+
+# max. count of posts being saved concurrently to the db by `DayNlp.save_day()`.
+SAVE_WORKERS = 16
+
 
 class DayNlp(Day, PostConfigMixin):
     """
@@ -54,6 +80,12 @@ class DayNlp(Day, PostConfigMixin):
         # to recognize new data (eg. posts edited/inserted by this process)
         self.start_time = datetime.datetime.now(datetime.timezone.utc)
 
+        # per-post decisions, resolved once for all posts
+        # text of posts (not for metaposts) never changes during NLP tasks: memoized by db id.
+        self.get_post_text = self.get_decision("get_post_text")
+        self.get_metapost_link = self.get_decision("get_metapost_link")
+        self.post_texts = {}
+
         self.counts = dict(
             # resp. total posts processed/saved, words processed
             total=0, saved=0, words=0,
@@ -61,18 +93,56 @@ class DayNlp(Day, PostConfigMixin):
             similarity=0, summary=0, metapost=0
         )
 
+        # metaposts are saved concurrently (cf. `.save_day()`): `.lock`, set by `Day`,
+        # also guards `.counts` updates, and models inference (`.summarize()`).
+
+        # updated fields of existing posts, and the verbs that updated them, by post db id.
+        # queued by `.queue_save()` to be sent to the db at once by `.flush_saves()`,
+        # ie. one update per post.
+        self.pending_saves = {}
+
+        # locks serializing saves of metaposts with the same lookup version,
+        # cf. `.save_metapost()`
+        self.metapost_locks = {}
+
+        # (summary, caption, categories) computed ahead of time, by text digest.
+        # also persisted to the db, so that re-runs skip models inference.
+        # cf. `.summarize()`
+        self.summaries = {}
+        self.summaries_cache = Collection(
+            self.settings['CRAWL_DB_NLP_CACHE'], db_or_uri=self.db_uri)
+        self.expire_summaries()
+
         # nlp models
-        corpus = [self.get_decision("get_post_text")(p) for p in self.posts]
-        self.vectorizer = TfidfVectorizer(lang="fr")(corpus)
-        self.categorizer = Categorizer(lang="fr")
-        self.text_summarizer = TextSummarizer(lang=self.lang)
-        self.title_summarizer = TitleSummarizer(lang=self.lang)
+        # tfidf: (posts x terms) matrix, with L2-normalized rows, hence cosine
+        # similarities of all posts pairs are obtained at once, by a single matmul,
+        # from which the similar posts of every post are indexed at once, ie. `.similar_posts`.
+        self.tfidf = self.vectorize(self.posts)
+        top_n = [params.get("top_n") for params in self.similarity.values()]
+        self.min_similarity = min(params["threshold"] for params in self.similarity.values())
+        self.max_similar = None if None in top_n else max(top_n)
+        self.similar_posts = self.index_similar(
+            self.get_similarities(), self.min_similarity, self.max_similar)
 
         # stats for the day
-        self.counts['similarity'] = self.vectorizer.num_docs
-        self.counts['words'] = self.vectorizer.corpus_len
+        self.counts['similarity'] = self.tfidf.shape[0]
         self.counts['total'] = len(self.posts)
 
+    # summarization models
+    # loaded on first use, eg. never by runs that only compute similarity.
+
+    @cached_property
+    def categorizer(self):
+        return Categorizer(lang=self.lang)
+
+    @cached_property
+    def text_summarizer(self):
+        return TextSummarizer(lang=self.lang)
+
+    @cached_property
+    def title_summarizer(self):
+        return TitleSummarizer(lang=self.lang)
+
     def save_day(self, verb=None):
 
         def build_params(verb):
@@ -86,11 +156,30 @@ class DayNlp(Day, PostConfigMixin):
             return {verb: params.get(verb)} if verb \
                 else params
 
-        for verb, params in build_params(verb).items():
-            for post in self.posts:
-                save = getattr(self, "save_%s" % verb)
-                _, status = save(post, **params)
-                self.counts["saved"] += status
+        # fields updated by all verbs are sent to the db at once, in a single
+        # update per post. (verbs run in turn, since eg. metaposts need
+        # the similarity and summaries of all posts beforehand.)
+        try:
+            for verb, params in build_params(verb).items():
+
+                # summarize all posts (resp. metaposts) at once, before saving them one by one.
+                if verb == "summary":
+                    self.summarize(map(self.get_text, self.posts))
+                if verb == METAPOST:
+                    self.summarize(filter(None, (self.get_metapost_text(p)[1] for p in self.posts)))
+
+                # only metaposts hit the db right away, hence are saved concurrently.
+                # other verbs queue their updates in memory, cf. `.queue_save()`
+                save = partial(getattr(self, "save_%s" % verb), **params)
+                if verb == METAPOST:
+                    with ThreadPoolExecutor(max_workers=SAVE_WORKERS) as executor:
+                        statuses = list(executor.map(save, list(self.posts)))
+                else:
+                    statuses = map(save, list(self.posts))
+                for _, status in statuses:
+                    self.counts["saved"] += status
+        finally:
+            self.flush_saves()
 
         self.log_ended(
             "saved ({saved}) fields in ({total}) docs, ({words}) words: "
@@ -107,87 +196,85 @@ class DayNlp(Day, PostConfigMixin):
 
         :param Post post: post doc to save similarity for
         :param bool overlap: include results from higher thresholds into lower ones?
-        :returns: saved (post, count).
+        :returns: (post, 0), the post being counted as saved by `.flush_saves()`.
         :rtype: (Post, int)
-
-        TODO: use only half the symmetric TF-IDF matrix to speed up the task
-        TODO: use optimised TF-IDF function from Spacy or Sklearn, instead of hand-crafted one
         """
 
         # uses tfidf model to vectorise title+text of entire article corpus
         # `.similarity` holds params for the model's `similar_to` api.
-        similar, saved = {}, 0
-        log_msg = \
-            f"{'' if saved else 'NOT'} saving `{list(self.similarity)}` similarity " \
-            f"({saved}) siblings, for doc #{post[self.db_id_field]} ..."
+        similar, seen_ids = {}, set()
+        log_msg = lambda: \
+            f"saving `{list(self.similarity)}` similarity " \
+            f"({sum(map(len, similar.values()))}) docs, for doc #{post[self.db_id_field]} ..."
+
+        # similar docs at the lowest threshold, by descending score, are computed once.
+        # docs similar at higher thresholds are just a prefix of those.
+        all_similar_docs = self.get_similar(
+            post, threshold=self.min_similarity, top_n=self.max_similar)
 
         for field, tfidf_params in self.similarity.items():
 
             # compute similar_docs and transform as db format, like so:
             # [{'_id': ObjectId('6283bcb2c176579f86acafb0'), 'score': 0.14859620818206487}, ...]
-            similar_docs = self.get_similar(post, **tfidf_params)
+            similar_docs = list(takewhile(
+                lambda it: it[1] >= tfidf_params["threshold"], all_similar_docs))
+            similar_docs = similar_docs[:tfidf_params.get("top_n")]
             db_value = [{self.db_id_field: p[self.db_id_field], SCORE: score}
                         for p, score in similar_docs]
 
             # remove previous intersecting doc sets. generated sets have
             # cardinals inversely proportional to resp. similarity scores
             if not overlap:
-                db_value = dictdiff(db_value, *similar.values())
+                db_value = [d for d in db_value if d[self.db_id_field] not in seen_ids]
+                seen_ids.update(d[self.db_id_field] for d in db_value)
 
             similar[field] = db_value
 
         try:
             if similar:
-                post = self.save(Post({**post, **similar}))
-            self.log_ok(log_msg)
+                post = self.queue_save(post, "similarity", log_msg, **similar)
 
         except Exception as exc:
-            self.log_failed(log_msg, exc, saved)
+            self.log_failed(log_msg, exc)
 
-        saved = int(bool(post))
-        self.counts["similarity"] += saved
-        return post, saved
+        return post, 0
 
     def save_summary(self, post: Post, **kwargs):
         """
         Generate (destructive) abstractive summaries (title, text, categories)
         for given post, using computed values, and persist it to the database.
 
-        :returns: saved (post, count).
+        :returns: (post, 0), the post being counted as saved by `.flush_saves()`.
         :rtype: (Post, int)
          """
 
-        text = self.get_decision("get_post_text")(post)
+        text = self.get_text(post)
         summary, caption, categories = self.get_summary(text)
         category = categories[0][0] if categories else CATEGORY_NOT_FOUND
 
-        log_msg = \
+        log_msg = lambda: \
             f"generating `summary` for doc #`{post[self.db_id_field]}`: " \
             f"summary: ({wordcount(summary)}/{wordcount(text)}) words, " \
             f"caption: ({wordcount(caption)}/{wordcount(post[TITLE])}) words, " \
             f"category: `{category}`."
 
         try:
-            post = self.save(Post({
-                **post,
+            post = self.queue_save(post, "summary", log_msg, **{
                 self.caption_field: caption,
                 self.summary_field: summary,
-                self.category_field: category}))
-            self.log_ok(log_msg)
+                self.category_field: category})
 
         except Exception as exc:
             self.log_failed(log_msg, exc)
 
-        saved = int(bool(post))
-        self.counts["summary"] += saved
-        return post, saved
+        return post, 0
 
     def save_metapost(self, src: Post, **kwargs):
         """ Generate a meta post from given post's siblings,
          and save it to the database in the metapost's collection. """
 
         metapost, saved = None, 0
-        log_msg = \
+        log_msg = lambda: \
             f"generating `{METAPOST}` " \
             f"{'#' + str(metapost[self.db_id_field]) if metapost else ''} " \
             f"for post #{src[self.db_id_field]}: "
@@ -197,16 +284,71 @@ class DayNlp(Day, PostConfigMixin):
             try:
                 # checks if exists a previous version of metapost in the db.
                 # only alters posts with same type, ie. `metapost.*`
-                metapost = self.save(metapost, only=(TYPE,),
-                                     id_field_or_match={'version': lookup_version})
+                # metaposts of the same version (same siblings) are saved one at a time,
+                # for the lookup and the update or creation are not atomic.
+                with self.lock:
+                    version_lock = self.metapost_locks.setdefault(lookup_version, threading.Lock())
+                with version_lock:
+                    metapost = self.save(metapost, only=(TYPE,),
+                                         id_field_or_match={'version': lookup_version})
                 self.log_ok(log_msg)
             except Exception as exc:
                 self.log_failed(log_msg, exc)
 
         saved = int(bool(metapost))
-        self.counts[METAPOST] += saved
+        with self.lock:
+            self.counts[METAPOST] += saved
         return metapost, saved
 
+    def queue_save(self, post: Post, verb: str, log_msg, **fields):
+        """ Update given fields of an existing post, in memory right away,
+        and in the db later on, by `.flush_saves()`. The post is counted as saved
+        by `verb`, and `log_msg` logged, once the db update succeeded.
+
+        :returns: the updated post
+        :rtype: Post
+        """
+        post = Post({**post, **fields})
+        post_id = post[self.db_id_field]
+        with self.lock:
+            save = self.pending_saves.setdefault(post_id, {'fields': {}, 'verbs': {}})
+            save['fields'].update(fields)
+            save['verbs'][verb] = log_msg
+            self[post_id] = post
+        return post
+
+    def flush_saves(self):
+        """ Send the updates queued by `.queue_save()` to the db, in bulk.
+        Counts the successfully updated posts as saved, by verb. """
+        with self.lock:
+            saves, self.pending_saves = self.pending_saves, {}
+        if not saves:
+            return
+
+        saves = list(saves.items())
+        writes = [UpdateOne({self.db_id_field: post_id}, {'$set': save['fields']})
+                  for post_id, save in saves]
+
+        failed = set()
+        log_msg = f"saving ({len(writes)}) posts to the db: "
+        try:
+            r = self.db[self.name].bulk_write(writes, ordered=False)
+            self.log_ok(log_msg + f"updated ({r.modified_count}/{r.matched_count})")
+        except BulkWriteError as exc:
+            failed = {e['index'] for e in exc.details.get('writeErrors', [])}
+            self.log_failed(log_msg + f"({len(failed)}) failed", exc)
+        except Exception as exc:
+            failed = set(range(len(writes)))
+            self.log_failed(log_msg, exc)
+
+        for i, (_, save) in enumerate(saves):
+            if i in failed:
+                continue
+            for verb, verb_log_msg in save['verbs'].items():
+                self.counts[verb] += 1
+                self.counts["saved"] += 1
+                self.log_ok(verb_log_msg)
+
     def mk_metapost(self, src: Post, **kwargs):
         """ Generate a meta post by compiling all siblings
         of the given post, given the configured strategy.
@@ -227,13 +369,9 @@ class DayNlp(Day, PostConfigMixin):
         :rtype: Post
         """
 
-        # TODO: leverage fact that similarity is a symmetric function to improve speed by x2.
         # TODO: strategy to get metapost from other methods than TF-IDF, eg. kNN, kernels?
         metapost, lookup_version = None, None
-        siblings = self.get_similar(src, from_field=self.siblings_field)
-        siblings, _ = zip(*siblings) if siblings else ([], [])
-        siblings_texts = [self.get_decision("get_post_text")(p, meta=True) for p in siblings]
-        _text = " ".join([add_fullstop(t) for t in siblings_texts])
+        siblings, _text = self.get_metapost_text(src)
 
         # exists _text, means there were non-empty siblings
         if _text:
@@ -241,12 +379,9 @@ class DayNlp(Day, PostConfigMixin):
 
             # `lookup_version`: possible existing database version of this metapost
             # It corresponds to previous siblings of this post, ie. that were not added by the current process.
-            old_siblings = filter(lambda p: p[self.db_id_field].generation_time <= self.start_time, siblings)
-            lookup_version = self.mk_metapost_version(old_siblings)
-
-            # the current version
+            # `VERSION`: the current version,
             # ie. after `.save_similarity()` may have added more siblings to `src` post.
-            metapost[VERSION] = self.mk_metapost_version(siblings)
+            lookup_version, metapost[VERSION] = self.mk_metapost_versions(siblings)
 
             # NLP fields. Models inference happen here.
             summary, caption, categories = self.get_summary(_text)
@@ -273,18 +408,17 @@ class DayNlp(Day, PostConfigMixin):
 
             # compile misc. data from siblings into metapost:
             # bool fields, str list fields, dict list fields
-            for post in siblings:
-
-                for f in IS_DRAFT, IS_SCRAP:  # bools
-                    metapost[f] &= post[f]
-                for f in IMAGES, VIDEOS, KEYWORDS, TAGS:  # strs
-                    metapost[f] = list(set(metapost[f]).union(post[f]))
-                for f in AUTHORS, :  # dicts
-                    metapost[f] = uniquedicts(metapost[f], post[f])
+            # each field merges the values of all siblings at once.
+            for f in IS_DRAFT, IS_SCRAP:  # bools
+                metapost[f] = all([metapost[f], *(post[f] for post in siblings)])
+            for f in IMAGES, VIDEOS, KEYWORDS, TAGS:  # strs
+                metapost[f] = list(set(metapost[f]).union(*(post[f] for post in siblings)))
+            for f in AUTHORS, :  # dicts
+                metapost[f] = uniquedicts(metapost[f], *(post[f] for post in siblings))
 
             # generate metapost link from user-defined creator func if any
             # default joins baseurl picked from the env and the metapost id
-            link = self.get_decision('get_metapost_link')(metapost)
+            link = self.get_metapost_link(metapost)
             short_link = urlparse(link).path
             metapost[SHORT_LINK] = short_link
             metapost[LINK] = link
@@ -295,12 +429,43 @@ class DayNlp(Day, PostConfigMixin):
 
         return metapost, lookup_version
 
-    def mk_metapost_version(self, posts: Iterable[Post]) -> str:
-        """ Predictable version for metapost generated from posts """
+    def get_text(self, post: Post) -> str:
+        """ Text of given post, computed once per post """
+        post_id = str(post[self.db_id_field])
+        text = self.post_texts.get(post_id)
+        if text is None:
+            text = self.post_texts[post_id] = self.get_post_text(post)
+        return text
+
+    def get_metapost_text(self, src: Post):
+        """ Siblings of given post, and their text to summarize into a metapost
+
+        :returns: (siblings, text)
+        :rtype: ([Post], str)
+        """
+        siblings = self.get_similar(src, from_field=self.siblings_field)
+        siblings, _ = zip(*siblings) if siblings else ([], [])
+        siblings_texts = (self.get_post_text(p, meta=True) for p in siblings)
+        return siblings, " ".join(add_fullstop(t) for t in siblings_texts)
+
+    def mk_metapost_versions(self, posts: Iterable[Post]) -> (str, str):
+        """
+        Versions of the metapost generated from posts, resp. from the posts that were
+        not added by the current process (lookup version), and from all posts.
+        Old posts being the oldest prefix of the posts sorted by age, both versions
+        are hashed in a single pass. Versions are md5 digests of the joined (str) post
+        ids, as stored with existing metaposts.
+
+        :returns: (<lookup version>, <version>)
+        """
         _posts = sorted(posts, key=lambda p: p[self.db_id_field].generation_time)
-        return hashlib.md5(
-            ''.join([str(p[self.db_id_field]) for p in _posts]).encode()
-        ).hexdigest()
+        version, lookup_version = hashlib.md5(), None
+        for p in _posts:
+            if lookup_version is None and p[self.db_id_field].generation_time > self.start_time:
+                lookup_version = version.hexdigest()
+            version.update(str(p[self.db_id_field]).encode())
+        version = version.hexdigest()
+        return lookup_version or version, version
 
     def get_similar(self, post, from_field=None, **kwargs):
         """
@@ -318,8 +483,8 @@ class DayNlp(Day, PostConfigMixin):
             similar = list(map(lambda args: (args[0], args[1].get(SCORE)), similar))
 
         else:
-            post_i: int = self.posts.index(post)
-            similar = self.vectorizer.similar_to(post_i, **kwargs)
+            post_i: int = self.post_index[str(post[self.db_id_field])]
+            similar = self.similar_to(post_i, **kwargs)
             similar = [(self.posts[j], score) for j, score in similar]
 
         log_msg = lambda post_score: \
@@ -333,12 +498,161 @@ class DayNlp(Day, PostConfigMixin):
 
         return similar
 
+    def vectorize(self, posts: [Post]):
+        """
+        TF-IDF matrix (sparse, float32, L2-normalized rows) of the texts of given posts.
+        Texts are streamed to the vectorizer, and their words counted on the fly.
+        Yields an empty (no terms) matrix if the corpus has no vocabulary.
+        """
+        def corpus():
+            for post in posts:
+                text = self.get_text(post)
+                self.counts['words'] += wordcount(text)
+                yield text
+
+        vectorizer = TfidfVectorizer(dtype=np.float32, stop_words=self.get_stop_words())
+        try:
+            return vectorizer.fit_transform(corpus()).tocsr()
+        except ValueError:
+            return sparse.csr_matrix((len(posts), 0), dtype=np.float32)
+
+    def get_stop_words(self) -> [str]:
+        """ Stop words of the posts language, from the nltk `stopwords` corpus.
+        The corpus gets downloaded if missing, cf. README. """
+        language = pycountry.languages.get(alpha_2=self.lang).name.lower()
+        try:
+            return nltk.corpus.stopwords.words(language)
+        except LookupError:
+            nltk.download('stopwords', quiet=True)
+            return nltk.corpus.stopwords.words(language)
+
+    def get_similarities(self):
+        """
+        Posts cosine similarity matrix, as a sparse matrix, with a zero diagonal
+        (posts aren't similar to themselves). Small TF-IDF matrices are multiplied
+        as dense arrays, which multithreaded BLAS does faster than the sparse product.
+        """
+        tfidf = self.tfidf
+        if tfidf.shape[0] * tfidf.shape[1] <= DENSE_SIMILARITY_MAX_SIZE:
+            tfidf = tfidf.toarray()
+            similarities = tfidf @ tfidf.T
+            np.fill_diagonal(similarities, 0)
+            return sparse.csr_matrix(similarities)
+        similarities = tfidf @ tfidf.T
+        return (similarities - sparse.diags(similarities.diagonal())).tocsr()
+
+    def index_similar(self, similarities, threshold: float, top_n=None):
+        """
+        Index similar posts of every post, from the similarity matrix.
+        Only the `top_n` most similar posts of every post are selected (partitioned)
+        out of its similar posts, and sorted.
+
+        :param similarities: sparse (posts x posts) similarity scores, zero diagonal.
+        :param float threshold: min. similarity score of indexed posts
+        :param int top_n: max. count of similar posts indexed per post
+        :returns: {<post index>: [(<post index>, <score>), ...]}, by descending score
+        """
+        similarities = similarities.tocsr()
+        similarities.data[similarities.data < threshold] = 0
+        similarities.eliminate_zeros()
+        similarities.sort_indices()
+
+        similar = {}
+        indptr, indices, data = similarities.indptr, similarities.indices, similarities.data
+        for i in np.flatnonzero(np.diff(indptr)).tolist():
+            cols, scores = indices[indptr[i]:indptr[i+1]], data[indptr[i]:indptr[i+1]]
+            if top_n is not None and len(scores) > top_n:
+                top = np.argpartition(-scores, top_n - 1)[:top_n] if top_n else []
+                cols, scores = cols[top], scores[top]
+            order = np.argsort(-scores, kind='stable')
+            similar[i] = list(zip(cols[order].tolist(), scores[order].tolist()))
+        return similar
+
+    def similar_to(self, i: int, threshold=0., top_n=None):
+        """
+        Posts most similar to the i-th post, by descending similarity score.
+        Only posts indexed at init are considered, ie. scoring at least `.min_similarity`.
+
+        :param int i: index of the post in `self.posts`
+        :param float threshold: min. similarity score
+        :param int top_n: max. count of similar posts to return
+        :returns: [(int, float)] : [( <post index>, <score>), ...]
+        """
+        similar = takewhile(lambda it: it[1] >= threshold, self.similar_posts.get(i, []))
+        return list(islice(similar, top_n))
+
+    def summarize(self, texts: Iterable[str]):
+        """
+        Summarize many texts at once, ahead of `.get_summary()` calls.
+        Summaries cached in the db are loaded at once; for other (unique) texts,
+        every model runs over all texts, rather than the three models being run
+        alternately text after text. The (independent) models run concurrently.
+        Results are kept in `.summaries`, by text digest.
+        """
+        with self.lock:
+            texts = {self.get_summary_key(t): t for t in texts}
+            texts = {k: t for k, t in texts.items() if k not in self.summaries}
+            self.load_summaries(list(texts))
+            keys = [k for k in texts if k not in self.summaries]
+            texts = [texts[k] for k in keys]
+
+            if not texts:
+                return
+
+            models = ("text_summarizer", "title_summarizer", "categorizer")
+            with ThreadPoolExecutor(max_workers=len(models)) as executor:
+                results = executor.map(
+                    lambda model: list(map(getattr(self, model), texts)), models)
+                summaries, captions, categories = results
+
+            summaries = dict(zip(keys, zip(summaries, captions, categories)))
+            self.summaries.update(summaries)
+
+        self.cache_summaries(summaries)
+
     def get_summary(self, text: str):
+        """ (summary, caption, categories) of given text """
+        key = self.get_summary_key(text)
+        if key not in self.summaries:
+            self.summarize([text])
+        return self.summaries[key]
+
+    def get_summary_key(self, text: str):
+        """ Key of the summary of given text, in `.summaries` and the db cache alike """
+        return "%s:%s:v%s" % (
+            hashlib.blake2b(text.encode(), digest_size=16).hexdigest(),
+            self.lang, SUMMARY_CACHE_VERSION)
+
+    def load_summaries(self, keys: [str]):
+        """ Load summaries with given keys from the db cache into `.summaries` """
+        if not keys:
+            return
+        try:
+            for doc in self.summaries_cache.find(match={'_id': {'$in': keys}}):
+                self.summaries[doc['_id']] = \
+                    doc['summary'], doc['caption'], doc['categories']
+        except Exception as exc:
+            self.log_failed("loading cached summaries", exc)
+
+    def cache_summaries(self, summaries: dict):
+        """ Save (summary, caption, categories) by key to the db cache, in bulk """
+        cached_at = datetime.datetime.now(datetime.timezone.utc)
+        writes = [UpdateOne({'_id': key}, {'$set': {
+            **dict(zip(('summary', 'caption', 'categories'), summary)), 'cached_at': cached_at
+        }}, upsert=True) for key, summary in summaries.items()]
+        try:
+            cache = self.summaries_cache
+            cache.db[cache.name].bulk_write(writes, ordered=False)
+        except Exception as exc:
+            self.log_failed(f"caching ({len(writes)}) summaries", exc)
 
-        summary = self.text_summarizer(text)
-        caption = self.title_summarizer(text)
-        categories = self.categorizer(text)
-        return summary, caption, categories
+    def expire_summaries(self):
+        """ Have the db drop cached summaries `SUMMARY_CACHE_TTL` seconds after caching """
+        try:
+            cache = self.summaries_cache
+            cache.db[cache.name].create_index('cached_at', expireAfterSeconds=SUMMARY_CACHE_TTL)
+        except Exception as exc:
+            self.log_failed("setting cached summaries expiry", exc)
 
     def expand_related(self, post: Post, field: str):
         """
@@ -353,11 +667,10 @@ class DayNlp(Day, PostConfigMixin):
         if db_related:
             for db_post in db_related:
                 item_id = db_post.get(self.db_id_field)
-                if item_id:                         # get the next post that matches
-                    post = next(filter(              # id of the related item
-                        lambda p: p[self.db_id_field] == item_id, self.posts), None)
-                    if post:
-                        related += [(post, db_post)]    # return existing value for field as well
+                if item_id:                         # get the post that matches
+                    i = self.post_index.get(str(item_id))   # id of the related item
+                    if i is not None:
+                        related += [(self.posts[i], db_post)]   # return existing value for field as well
 
         return related
 
@@ -2,15 +2,95 @@
 #
 # Don't forget to add your pipeline to the ITEM_PIPELINES setting
 # See: https://docs.scrapy.org/en/latest/topics/item-pipeline.html
+import datetime
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future
+from functools import cached_property
+
 import requests
-from PIL import UnidentifiedImageError
-from PIL import Image
+from requests.adapters import HTTPAdapter
+from bson import ObjectId
+from PIL import Image, ImageFile
 from imquality import brisque
 from itemadapter import ItemAdapter
+from pymongo import UpdateOne
 from scrapy.exceptions import DropItem
+from twisted.internet import task
 
 from newsutils.crawl import BasePostPipeline
-from newsutils.conf import VERSION, SHORT_LINK, PUBLISH_TIME, IMAGES
+from newsutils.conf import VERSION, SHORT_LINK, PUBLISH_TIME, IMAGES, LINK
+
+
+# max. count of days whose posts `CheckEdits` keeps in memory
+CHECK_EDITS_MAX_DAYS = 8
+
+# `SaveToDb` sends posts to the db at once, by batches of up to `SAVE_BATCH_SIZE` posts,
+# at least every `SAVE_INTERVAL` seconds. small, since queued posts are lost on a crash.
+SAVE_BATCH_SIZE = 50
+SAVE_INTERVAL = 5
+
+# max. count of a post's images being downloaded concurrently by `DropLowQualityImages`
+IMAGES_FETCH_WORKERS = 8
+
+# image downloads are streamed by chunks of this size (bytes), so that
+# images are sized from their headers, before downloading them entirely.
+IMAGES_CHUNK_SIZE = 16 * 1024
+
+# images above this size (bytes) are dropped, rather than downloaded entirely.
+IMAGES_MAX_SIZE = 20 * 1024 * 1024
+
+# (connect, read) timeouts (seconds) of image downloads
+IMAGES_FETCH_TIMEOUT = (3, 10)
+
+
+# images are downscaled to this max. width/height (px) before BRISQUE scoring
+BRISQUE_MAX_DIMENSION = 512
+
+
+def brisque_score(content: bytes):
+    """ BRISQUE score of the image with given content, downscaled if large.
+    Module-level, to run in `DropLowQualityImages`' worker processes. """
+    image = Image.open(io.BytesIO(content))
+    # JPEGs get decoded at a reduced scale right away
+    image.draft(image.mode, (BRISQUE_MAX_DIMENSION, BRISQUE_MAX_DIMENSION))
+    scale = BRISQUE_MAX_DIMENSION / max(image.size)
+    if scale < 1:
+        size = round(image.width * scale), round(image.height * scale)
+        image = image.resize(size, Image.BILINEAR)
+    return brisque.score(image)
+
+
+def normalize_value(value):
+    """ Value in a canonical form, alike for the db and the scraped copies of a post field:
+    mappings have sorted keys, sequences become lists, numbers floats, datetimes naive UTC
+    with the db's (millisecond) precision. """
+    if isinstance(value, dict):
+        return {str(k): normalize_value(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [normalize_value(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((normalize_value(v) for v in value), key=repr)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo:
+            value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return value.replace(microsecond=value.microsecond // 1000 * 1000).isoformat()
+    return value
+
+
+def post_digest(post, fields) -> bytes:
+    """ 64-bit digest of given fields of post, normalized, cf. `normalize_value()`.
+    Posts with equal digests have identical fields, cf. `CheckEdits.check_edits()` """
+    values = [normalize_value(post.get(f)) for f in fields]
+    data = json.dumps(values, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.blake2b(data.encode('utf-8', 'replace'), digest_size=8).digest()
 
 
 class SaveToDb(BasePostPipeline):
@@ -23,16 +103,90 @@ class SaveToDb(BasePostPipeline):
         if existing post is detected, wt of replacing existing posts intentionally?
     """
 
+    # pending db writes, by daily collection name: (collection, [write, ...], time of
+    # the oldest write). sent to the db in bulk, every `SAVE_BATCH_SIZE` writes or
+    # `SAVE_INTERVAL` seconds, cf. `.flush()`, `.flush_due()`
+    pending = None
+
+    # posts of the pending writes, by daily collection name, then by item id.
+    # looked up by `CheckEdits`, which can't find them in the db yet.
+    pending_posts = None
+
+    # periodic `.flush_due()` call, while the spider is open
+    flush_loop = None
+
+    # running instances, cf. `.get_pending_post()`
+    _instances = weakref.WeakSet()
+
+    def open_spider(self, spider):
+        super().open_spider(spider)
+        self.pending, self.pending_posts = {}, {}
+        self._instances.add(self)
+        self.flush_loop = task.LoopingCall(self.flush_due)
+        self.flush_loop.start(SAVE_INTERVAL, now=False)
+
+    def close_spider(self, spider):
+        if self.flush_loop and self.flush_loop.running:
+            self.flush_loop.stop()
+        for name in list(self.pending):
+            self.flush(name)
+        self._instances.discard(self)
+
+    @classmethod
+    def get_pending_post(cls, name, item_id) -> dict:
+        """ Post with given item id, saved to the daily collection with given name,
+        but not yet sent to the db. """
+        for pipeline in list(cls._instances):
+            post = pipeline.pending_posts.get(name, {}).get(item_id)
+            if post:
+                return post
+
+    def flush_due(self):
+        """ Send pending writes that are either `SAVE_BATCH_SIZE` writes
+        or `SAVE_INTERVAL` seconds old to the db. Also run periodically,
+        for idle spiders not to hold writes back. """
+        for name, (_, writes, since) in list(self.pending.items()):
+            if len(writes) >= SAVE_BATCH_SIZE or time.monotonic() - since >= SAVE_INTERVAL:
+                self.flush(name)
+
     def process_post(self):
         """
         Save the post currently being processed by the item pipeline, ie. `self.post
         into the configured MongoDB. Performs an update (vs. an insertion) if the post
         already exists, ie. possesses a database id.
-        :return: Post: altered (database operation result), or passed on post.
+        Writes are queued, and sent to the db in bulk.
+        :return: Post: passed on post, with its database id set.
         """
 
-        post = self.day.save(self.post)
-        return post or self.post
+        adapter = ItemAdapter(self.post)
+        post_id = ObjectId(adapter.get(self.db_id_field) or None)
+        adapter[self.db_id_field] = post_id
+        doc = adapter.asdict()
+        if self.post.is_meta:
+            doc[LINK] = self.day.get_decision('get_metapost_link')(doc)
+        write = UpdateOne({self.db_id_field: post_id},
+                          {'$set': {k: v for k, v in doc.items() if k != self.db_id_field}},
+                          upsert=True)
+
+        name = str(self.day)
+        _, writes, _ = self.pending.setdefault(name, (self.day.db[name], [], time.monotonic()))
+        writes.append(write)
+        self.pending_posts.setdefault(name, {})[doc.get(self.item_id_field)] = doc
+        self.flush_due()
+
+        return adapter.item
+
+    def flush(self, name):
+        """ Send the pending writes to the daily collection with given name, in bulk. """
+        collection, writes, _ = self.pending.pop(name)
+        self.pending_posts.pop(name, None)
+        log_msg = f"saving ({len(writes)}) posts to `{name}`: "
+        try:
+            r = collection.bulk_write(writes, ordered=False)
+            self.log_ok(log_msg + f"inserted ({r.upserted_count}), "
+                                  f"updated ({r.modified_count}/{r.matched_count})")
+        except Exception as exc:
+            self.log_failed(log_msg, exc)
 
 
 class FilterDate(BasePostPipeline):
@@ -71,51 +225,92 @@ class CheckEdits(BasePostPipeline):
     Pipeline must have relatively high priority in `settings.ITEM_PIPELINES`.
     """
 
+    # by date, least recently loaded first.
+    # only the `CHECK_EDITS_MAX_DAYS` most recently loaded days are kept.
     _ids_seen = {}
+    _posts_seen = {}
+
+    # fields compared by `.check_edits()`, by post class
+    _check_fields = {}
+
+    @property
+    def posts_seen(self) -> dict:
+        """ Posts of the day that exist in the db, by item id. Loaded at once,
+        then reduced to what's needed to check edits, cf. `.mk_seen_post()`. """
+        if self.day.date not in self._posts_seen:
+            if len(self._posts_seen) >= CHECK_EDITS_MAX_DAYS:
+                date = next(iter(self._posts_seen))
+                self._posts_seen.pop(date)
+                self._ids_seen.pop(date, None)
+
+            # rows with no `item_id_field` are skipped by the db
+            projection = {f: False for f in self.edits_excluded_fields
+                          if f not in (self.db_id_field, self.item_id_field, VERSION)}
+            posts = self.day.find(match={self.item_id_field: {'$ne': None}},
+                                  projection=projection or None)
+            self._posts_seen[self.day.date] = {
+                p[self.item_id_field]: self.mk_seen_post(p) for p in posts}
+        return self._posts_seen[self.day.date]
 
     @property
     def ids_seen(self) -> set[str]:
-        # FIXME: not resilent if `item.get(self.item_id_field)` returns None,
-        #  ie, if db yields row with no `item_id_field`. FIX: filter(lambda x: x, l)
+        posts_seen = self.posts_seen
         if self.day.date not in self._ids_seen:
-            self._ids_seen[self.day.date] = \
-                set(map(lambda it: it.get(self.item_id_field), self.day.find(
-                    projection={self.item_id_field: True, '_id': False})))
+            self._ids_seen[self.day.date] = set(posts_seen)
         return self._ids_seen[self.day.date]
 
     def process_post(self):
 
-        adapter = ItemAdapter(self.post)
-        item_id_field = adapter[self.item_id_field]  # or self.post[self.item_id_field] ???
-        version_field = VERSION
+        # `Post` items, cf. `.is_valid()`
+        post = self.post
+        item_id = post[self.item_id_field]
 
         # new posts (unseen) are sent down the pipeline right away, whereas
         # edited versions of existing posts are further processed based on
         # the nature of the edit. non-modified (pristine) posts are dropped.
-        if item_id_field not in self.ids_seen:
-            self.ids_seen.add(item_id_field)
+        if item_id not in self.ids_seen:
+            self.ids_seen.add(item_id)
         else:
             existing_post, status = self.check_edits()
 
             if status['pristine']:
                 # identical post matched in database
                 # drop duplicate post (prevents from reaching the `SaveToDb` pipeline)
-                self.log_ok(f"dropping duplicate post: {item_id_field}")
+                self.log_ok(f"dropping duplicate post: {item_id}")
                 raise DropItem("duplicate post")
 
             if status['new_version']:
                 # content was altered in a major way, suggests new version of post
                 # increment post version, also return post without id for new post
                 # creation by the `SaveToDb` pipeline
-                adapter[version_field] = int(existing_post[version_field]) + 1
+                post[VERSION] = int(existing_post[VERSION]) + 1
             else:
                 # otherwise, consider the update minor, and update existing post
                 # returning post with `_id` attribute set will trigger an update
                 # by the `SaveToDb` pipeline instead of an insert
-                adapter.update({'_id': existing_post['_id']})  # sets `_id` from existing db post
+                post['_id'] = existing_post['_id']  # sets `_id` from existing db post
 
         # will probably get saved to db.
-        return adapter.item
+        return post
+
+    def get_check_fields(self, post_cls) -> (tuple, tuple):
+        """ (all, new version) fields of given post class compared by `.check_edits()`,
+        ie. except excluded fields. Computed once per post class. """
+        if post_cls not in self._check_fields:
+            excluded_fields = frozenset(self.edits_excluded_fields)
+            self._check_fields[post_cls] = (
+                tuple(f for f in post_cls.fields if f not in excluded_fields),
+                tuple(f for f in self.edits_new_version_fields if f not in excluded_fields))
+        return self._check_fields[post_cls]
+
+    def mk_seen_post(self, post) -> dict:
+        """ Existing (db) post, as compared against the current post by `.check_edits()`:
+        its ids and version, and digests of its (all, new version) compared fields. """
+        all_fields, new_version_fields = self.get_check_fields(type(self.post))
+        return {
+            '_id': post['_id'], VERSION: post.get(VERSION),
+            'digests': (post_digest(post, all_fields), post_digest(post, new_version_fields))
+        }
 
     def check_edits(self, updated_fields=None):
         """
@@ -132,18 +327,24 @@ class CheckEdits(BasePostPipeline):
         # should cause caller to drop already existing posts
         status = dict(pristine=True, new_version=False)
 
-        all_fields = list(self.post.fields)
-        excluded_fields = self.edits_excluded_fields
-        new_version_fields = self.edits_new_version_fields
-        existing_post = self.day.find_one({self.item_id_field: self.post[self.item_id_field]})
-
-        have_changed = lambda fields: any(
-            [self.post[f] != existing_post[f] for f in fields
-             if f not in excluded_fields])
-
+        # posts `SaveToDb` has yet to send to the db are the most recent,
+        # posts saved since `.posts_seen` was loaded are looked up in the db
+        item_id = self.post[self.item_id_field]
+        existing_post = SaveToDb.get_pending_post(str(self.day), item_id)
+        existing_post = existing_post and self.mk_seen_post(existing_post) or \
+            self.posts_seen.get(item_id)
+        if not existing_post:
+            existing_post = self.day.find_one({self.item_id_field: item_id})
+            existing_post = existing_post and self.mk_seen_post(existing_post)
+
+        # fields are compared through their digests.
+        # new version fields being post fields, a pristine post can't be a new version
         if existing_post:
-            status['pristine'] = not have_changed(all_fields)
-            status['new_version'] = have_changed(new_version_fields)
+            all_digest, new_version_digest = existing_post['digests']
+            all_fields, new_version_fields = self.get_check_fields(type(self.post))
+            status['pristine'] = post_digest(self.post, all_fields) == all_digest
+            status['new_version'] = not status['pristine'] and \
+                post_digest(self.post, new_version_fields) != new_version_digest
 
         return existing_post, status
 
@@ -171,6 +372,30 @@ class DropLowQualityImages(BasePostPipeline):
 
     log_prefix = "drop noqa images"
 
+    @cached_property
+    def brisque_pool(self):
+        """ Worker processes scoring images (CPU-bound), cf. `brisque_score()`.
+        Not forked from the crawler process, whose threads may hold locks. """
+        return ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                   mp_context=multiprocessing.get_context('forkserver'))
+
+    @cached_property
+    def session(self):
+        """ HTTP session downloading images. Reuses connections to image hosts,
+        up to one per concurrent download. Images are compressed already. """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=IMAGES_FETCH_WORKERS)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers['Accept-Encoding'] = 'identity'
+        return session
+
+    def close_spider(self, spider):
+        if 'brisque_pool' in self.__dict__:
+            self.brisque_pool.shutdown()
+        if 'session' in self.__dict__:
+            self.session.close()
+
     def process_post(self):
         self.validate_images()
         return self.post
@@ -186,7 +411,7 @@ class DropLowQualityImages(BasePostPipeline):
             return image.width >= min_w and \
                    image.height >= min_h
 
-        def has_acceptable_quality(image: Image):
+        def has_acceptable_quality(url: str, score: Future):
             """
             Uses BRISQUE (Blind Reference-less Image Spatial Quality Evaluator)
             Refs:
@@ -198,24 +423,56 @@ class DropLowQualityImages(BasePostPipeline):
                 https://giters.com/ocampor/image-quality/issues/23?amp=1
             """
             try:
-                return brisque.score(image) <= \
+                return score.result() <= \
                        self.image_brisque_max_score
             except Exception as exc:
-                self.log_failed(image.shortname_, exc)
+                self.log_failed(shortname(url), exc)
                 return self.image_brisque_ignore_exception
 
-        keep_images = []
-        for url in self.post[IMAGES]:
+        def shortname(url: str):
+            return url.rsplit("/", 1)[-1]
+
+        def fetch_image(url):
+            """ Download image at url, only if it has an acceptable size.
+            Reading stops as soon as the image header yields its size.
+            Returns the image content, the image being decoded by `brisque_score()`. """
             try:
-                im = Image.open(requests.get(url, stream=True).raw)
-                im.filename = im.filename or url
-                im.shortname_ = im.filename.rsplit("/", 1)[-1]  # pseudo prop
-            except UnidentifiedImageError:
-                continue
+                with self.session.get(url, stream=True, timeout=IMAGES_FETCH_TIMEOUT) as response:
+                    chunks, size, parser = [], 0, ImageFile.Parser()
+                    for chunk in response.iter_content(IMAGES_CHUNK_SIZE):
+                        size += len(chunk)
+                        if size > IMAGES_MAX_SIZE:
+                            return None
+                        chunks.append(chunk)
+                        # the parser only reads in the header (unidentified content is
+                        # read up to `IMAGES_MAX_SIZE`), and the size gets checked once
+                        if parser is not None:
+                            parser.feed(chunk)
+                            if parser.image:
+                                if not has_acceptable_size(parser.image):
+                                    return None
+                                parser = None
+                    if parser is not None:
+                        return None
+
+                return b"".join(chunks)
+            except (requests.RequestException, Image.DecompressionBombError):
+                return None
+
+        # images are downloaded concurrently, and the acceptable-sized ones
+        # scored in worker processes as soon as they are available.
+        scored = []
+        urls = self.post[IMAGES]
+        with ThreadPoolExecutor(max_workers=IMAGES_FETCH_WORKERS) as executor:
+            for url, content in zip(urls, executor.map(fetch_image, urls)):
+                if content:
+                    scored.append((url, self.brisque_pool.submit(brisque_score, content)))
 
-            if has_acceptable_size(im) and has_acceptable_quality(im):
+        keep_images = []
+        for url, score in scored:
+            if has_acceptable_quality(url, score):
                 keep_images.append(url)
-                self.log_ok(im.shortname_)
+                self.log_ok(shortname(url))
 
         # log stats
         self.stats["total"] = len(self.post[IMAGES])
@@ -1,11 +1,8 @@
-import inspect
-import traceback
 import warnings
-from typing import Iterable
+from concurrent.futures import ThreadPoolExecutor
 
 import scrapy
 from daily_query.mongo import Collection
-from itemadapter import ItemAdapter
 from scrapy.spiderloader import SpiderLoader
 
 from newsutils.crawl import BasePostCrawler, PostCrawlerContext
@@ -14,7 +11,16 @@ from newsutils.logging import LoggingMixin
 
 
 def create_post_crawler_class(ctx):
-    attrs = ItemAdapter(PostCrawlerContext(ctx)).asdict()
+    """ Spider class initialised with given context.
+    None if the context has no name, ie. the spider couldn't be instantiated.
+
+    :param dict|PostCrawlerContext ctx: spider context; flat, hence copied as-is.
+    """
+    if not isinstance(ctx, PostCrawlerContext):
+        ctx = PostCrawlerContext(ctx)
+    attrs = dict(ctx)
+    if not attrs.get('name'):
+        return None
     name = to_camel(attrs['name'])
     return type(name, (BasePostCrawler,), attrs)
 
@@ -30,11 +36,7 @@ def iter_spider_classes(contexts):
 
     for ctx in contexts:
         obj = create_post_crawler_class(ctx)
-        if (
-                inspect.isclass(obj)
-                and issubclass(obj, BasePostCrawler)
-                and getattr(obj, 'name', None)
-        ):
+        if obj:
             obj.__module__ = __name__
             yield obj
 
@@ -47,43 +49,52 @@ class DatabaseSpiderLoader(LoggingMixin, SpiderLoader):
     """
 
     def __init__(self, settings):
+        # set beforehand: Scrapy's init loads all spiders, cf. `._load_contexts()`
         self.settings = settings
         super().__init__(settings)
 
     def _load_all_spiders(self):
 
-        # default, loads spiders from `settings.SPIDER_MODULES`
-        super()._load_all_spiders()
-
-        # loads spiders from the db
-        try:
-            contexts = self._load_contexts()
-            for spcls in iter_spider_classes(contexts):
-                self._found[spcls.name].append((spcls.__module__, spcls.__name__))
-                self._spiders[spcls.name] = spcls
-        except Exception:
-            if self.warn_only:
-                warnings.warn(
-                    f"\n{traceback.format_exc()}Could not load spiders from database. "
-                    "See above traceback for details.",
-                    category=RuntimeWarning)
-            else:
-                raise
+        # default, loads spiders from `settings.SPIDER_MODULES`,
+        # while spider contexts are being read from the db
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            contexts = executor.submit(self._load_contexts)
+            super()._load_all_spiders()
+
+        # loads spiders from the db, one context at a time:
+        # a faulty context doesn't prevent the others from loading
+        failed = []
+        for ctx in contexts.result():
+            try:
+                if not ctx.get('name'):
+                    raise ValueError(f"spider context has no name: {dict(ctx)}")
+                for spcls in iter_spider_classes([ctx]):
+                    self._found[spcls.name].append((spcls.__module__, spcls.__name__))
+                    self._spiders[spcls.name] = spcls
+            except Exception as exc:
+                if not self.warn_only:
+                    raise
+                failed.append(f"{ctx.get('name')}: {exc!r}")
+        if failed:
+            warnings.warn(
+                f"Could not load spiders from database: {'; '.join(failed)}",
+                category=RuntimeWarning)
 
         # checks dupes across both modules and the db
         self._check_name_duplicates()
 
-    def _load_contexts(self) -> Iterable[PostCrawlerContext]:
+    def _load_contexts(self) -> [PostCrawlerContext]:
+        """ Spider contexts from the db, read at once. """
+        name = self.settings['CRAWL_DB_SPIDERS']
         try:
-            db_collection = Collection(
-                self.settings['CRAWL_DB_SPIDERS'],
-                db_or_uri=self.settings["CRAWL_DB_URI"]
-            )
-            for ctx in db_collection.find():
-                yield PostCrawlerContext(ctx)
+            db_collection = Collection(name, db_or_uri=self.settings["CRAWL_DB_URI"])
+            # only fields of the context are read
+            projection = {f: True for f in PostCrawlerContext.fields}
+            return [PostCrawlerContext(ctx) for ctx in db_collection.find(projection=projection)]
         except Exception as e:
             self.log_error(
                 f'error loading initializer context '
-                f'from database collection {db_collection.name} @ {db_collection.db.name} '
+                f'from database collection {name} '
                 f'for spider of type `BasePostCrawler` ', str(e)
             )
+            return []